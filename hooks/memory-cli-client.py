@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Memory CLI client — forwards a command to a running `memory-cli.py daemon`.
+
+Drop-in replacement for memory-cli.py on the hook path: same arguments, same
+output, but served by a warm daemon over a UNIX socket instead of a fresh
+interpreter that re-imports and re-opens the DB. When no daemon is listening,
+one is started in the background and this call runs memory-cli.py directly.
+
+Usage:
+    python memory-cli-client.py pre-task --description "..."
+"""
+
+import json
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+CLI = Path(__file__).resolve().with_name("memory-cli.py")
+STDIN_COMMANDS = {"pre-task", "post-task"}
+
+
+def _socket_path() -> Path:
+    # Mirrors the PROJECT_DIR / MEMORY_DIR resolution in memory-cli.py
+    cwd = Path.cwd()
+    if (cwd / ".claude").exists() or (cwd / ".claude-memory").exists():
+        project = cwd
+    else:
+        project = Path(__file__).resolve().parent.parent
+    memory_dir = project / ".claude-memory" / "db"
+    if not memory_dir.exists() and (project / ".clod").exists():
+        memory_dir = project / ".clod"
+    return memory_dir / "cli.sock"
+
+
+def main():
+    argv = sys.argv[1:]
+    stdin = ""
+    if argv[:1] and argv[0] in STDIN_COMMANDS and sys.stdin and not sys.stdin.isatty():
+        stdin = sys.stdin.read(2000)
+
+    sock_path = _socket_path()
+    s = None
+    if hasattr(socket, "AF_UNIX"):
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.settimeout(10)
+        try:
+            s.connect(str(sock_path))
+        except OSError:
+            s.close()
+            s = None
+    if s is None:
+        # No daemon (or no AF_UNIX): warm one up for next time, serve this call
+        # directly. Nothing was sent yet, so this cannot run the command twice.
+        if hasattr(socket, "AF_UNIX") and len(str(sock_path)) < 100:
+            subprocess.Popen(
+                [sys.executable, str(CLI), "daemon"],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        proc = subprocess.run([sys.executable, str(CLI)] + argv, input=stdin, text=True)
+        sys.exit(proc.returncode)
+
+    with s:
+        try:
+            s.sendall(json.dumps({"argv": argv, "stdin": stdin}).encode("utf-8") + b"\n")
+            resp = json.loads(s.makefile("rb").readline())
+        except (OSError, ValueError) as e:
+            # The daemon may already have run the command (e.g. a read timeout);
+            # re-running it here could store the same node twice
+            sys.stderr.write(f"[memory-cli-client] Error: no reply from daemon ({e})\n")
+            sys.exit(1)
+
+    sys.stdout.write(resp.get("stdout", ""))
+    sys.stderr.write(resp.get("stderr", ""))
+    sys.exit(resp.get("code", 0))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,23 +11,25 @@ Adapted for claude-code-memory: uses .claude-memory/db/memory.db path.
 Usage:
     python memory-cli.py context "task description"
     python memory-cli.py store <key> <value> [--type pattern]
-    python memory-cli.py search "query" [--limit N]
-    python memory-cli.py stats
+    python memory-cli.py search "query" [--limit N] [--pretty]
+    python memory-cli.py stats [--pretty]
     python memory-cli.py session-end [--json '{"what_worked":[...]}']
     python memory-cli.py pre-task [--description "..."]
     python memory-cli.py post-task
+    python memory-cli.py daemon [--idle-timeout SECONDS]
 """
 
 from __future__ import annotations
 
-import argparse
+import atexit
+import io
 import json
+import re
 import sqlite3
 import sys
 import os
-from datetime import datetime
 from pathlib import Path
-from uuid import uuid4
+from types import SimpleNamespace
 
 # ── Paths ─────────────────────────────────────────────────────────────────────
 
@@ -48,6 +50,20 @@ if not MEMORY_DIR.exists():
         MEMORY_DIR = _legacy
 
 DB_PATH = MEMORY_DIR / "memory.db"
+# Written to PRAGMA user_version once the schema DDL has run; _ensure_db
+# skips the DDL when the DB already reports this version and FTS5 is available
+SCHEMA_VERSION = 5
+
+# UNIX socket served by `memory-cli.py daemon`
+SOCKET_PATH = MEMORY_DIR / "cli.sock"
+
+# Process-wide connection, opened lazily by _ensure_db()
+_CONN: sqlite3.Connection | None = None
+# Cached result of _has_gepa_columns()
+_GEPA_OK: bool | None = None
+# Set by _ensure_db() on every open: False when this SQLite build lacks FTS5,
+# and searches then fall back to LIKE
+_FTS_OK = True
 AGENT_ID = "claude-code"
 
 FAST_COMMANDS = {"pre-task", "post-task", "session-end"}
@@ -60,122 +76,414 @@ PII_PATTERNS = [
     r"api[_\-]?key\s*=\s*[\"'][^\"']+[\"']",
 ]
 
+# One alternation, so a single scan covers every pattern. Compiled by _pii_re()
+# on first use: hook calls on clean text never pay for the compile
+_PII_UNION: re.Pattern | None = None
+
+# Every PII pattern starts with one of these literals; clean text (the common
+# case) is rejected by a plain substring scan before any regex runs
+_PII_LITERALS = ("sk-", "ghp_", "password", "api_key", "apikey", "api-key")
+_PII_LITERALS_CF = tuple(s.casefold() for s in _PII_LITERALS)
+# IGNORECASE also matches ſ (U+017F) as s, and İ/ı (U+0130/U+0131) as i.
+# casefold() covers ſ; this maps the dotted/dotless i leftovers so the
+# prescreen never rejects text the regex would redact
+_PII_FOLD_I = {0x131: "i", 0x307: None}
+# Shortest possible match is apikey='x'; anything shorter skips even the
+# casefolded copy
+_PII_MIN_LEN = 10
+
+
+def _pii_re() -> re.Pattern:
+    global _PII_UNION
+    if _PII_UNION is None:
+        _PII_UNION = re.compile("|".join(f"(?:{p})" for p in PII_PATTERNS), re.IGNORECASE)
+    return _PII_UNION
+
+
+def _may_contain_pii(text: str) -> bool:
+    if len(text) < _PII_MIN_LEN:
+        return False
+    cf = text.casefold().translate(_PII_FOLD_I)
+    return any(lit in cf for lit in _PII_LITERALS_CF)
+
 
 def contains_pii(text: str) -> bool:
-    import re
-    return any(re.search(p, text, re.IGNORECASE) for p in PII_PATTERNS)
+    return _may_contain_pii(text) and _pii_re().search(text) is not None
 
 
 def sanitize(text: str) -> str:
-    import re
-    for p in PII_PATTERNS:
-        text = re.sub(p, "[REDACTED]", text, flags=re.IGNORECASE)
-    return text
+    """Redact PII in one regex pass; clean text is returned as-is."""
+    if not _may_contain_pii(text):
+        return text
+    return _pii_re().sub("[REDACTED]", text)
 
 
 # ── Fast SQLite Layer ────────────────────────────────────────────────────────
 
+def _close_db():
+    global _CONN
+    if _CONN is not None:
+        _CONN.close()
+        _CONN = None
+
+
+atexit.register(_close_db)
+
+
+_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-20000;
+"""
+
+_SCHEMA_DDL = """
+    BEGIN;
+    CREATE TABLE IF NOT EXISTS nodes (
+        id TEXT PRIMARY KEY,
+        agent_id TEXT NOT NULL,
+        node_type TEXT NOT NULL,
+        content TEXT NOT NULL,
+        metadata TEXT DEFAULT '{}',
+        importance REAL DEFAULT 0.5,
+        created_at TEXT NOT NULL,
+        accessed_at TEXT NOT NULL,
+        access_count INTEGER DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS relations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        agent_id TEXT NOT NULL,
+        source_id TEXT NOT NULL,
+        target_id TEXT NOT NULL,
+        relation_type TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_nodes_type ON nodes(node_type);
+    -- Serves fast_query_rows' agent filter + ORDER BY without a sort step, and
+    -- any agent_id-only lookup through its leading column
+    CREATE INDEX IF NOT EXISTS idx_nodes_rank ON nodes(agent_id, importance DESC, access_count DESC);
+    DROP INDEX IF EXISTS idx_nodes_importance;
+    DROP INDEX IF EXISTS idx_nodes_agent;
+    COMMIT;
+"""
+
+# FTS5 index over nodes.content, kept in sync by triggers
+_FTS_DDL = """
+    BEGIN;
+    CREATE VIRTUAL TABLE IF NOT EXISTS nodes_fts USING fts5(
+        content, content='nodes', content_rowid='rowid', tokenize='porter unicode61'
+    );
+    CREATE TRIGGER IF NOT EXISTS nodes_fts_ai AFTER INSERT ON nodes BEGIN
+        INSERT INTO nodes_fts(rowid, content) VALUES (new.rowid, new.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS nodes_fts_ad AFTER DELETE ON nodes BEGIN
+        INSERT INTO nodes_fts(nodes_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS nodes_fts_au AFTER UPDATE OF content ON nodes BEGIN
+        INSERT INTO nodes_fts(nodes_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+        INSERT INTO nodes_fts(rowid, content) VALUES (new.rowid, new.content);
+    END;
+"""
+
+# Without FTS5 every write to nodes would fail on these triggers ("no such
+# module: fts5"). Dropping them leaves nodes_fts stale, so user_version is reset
+# too: the next open with FTS5 recreates the triggers and rebuilds the index.
+_FTS_DROP_DDL = """
+    BEGIN;
+    DROP TRIGGER IF EXISTS nodes_fts_ai;
+    DROP TRIGGER IF EXISTS nodes_fts_ad;
+    DROP TRIGGER IF EXISTS nodes_fts_au;
+    PRAGMA user_version=0;
+    COMMIT;
+"""
+
+
 def _ensure_db():
-    """Ensure database exists with correct schema."""
-    MEMORY_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS nodes (
-            id TEXT PRIMARY KEY,
-            agent_id TEXT NOT NULL,
-            node_type TEXT NOT NULL,
-            content TEXT NOT NULL,
-            metadata TEXT DEFAULT '{}',
-            importance REAL DEFAULT 0.5,
-            created_at TEXT NOT NULL,
-            accessed_at TEXT NOT NULL,
-            access_count INTEGER DEFAULT 0
-        )
-    """)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS relations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            agent_id TEXT NOT NULL,
-            source_id TEXT NOT NULL,
-            target_id TEXT NOT NULL,
-            relation_type TEXT NOT NULL,
-            created_at TEXT NOT NULL
-        )
-    """)
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_agent ON nodes(agent_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_type ON nodes(node_type)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_importance ON nodes(importance)")
+    """Return the cached connection, opening it on first use.
+
+    Setup (PRAGMAs, schema check) runs once per process; handlers share the
+    connection and never close it — _close_db() runs at exit.
+
+    The DB runs in WAL mode, so SQLite keeps ``memory.db-wal`` and
+    ``memory.db-shm`` sidecar files next to it while a connection is open.
+    They are part of the database: never copy or delete ``memory.db``
+    without them. The WAL is checkpointed back into ``memory.db`` when the
+    last connection closes.
+
+    With synchronous=NORMAL a commit is durable once the WAL is synced at
+    checkpoint rather than on every insert: a power loss can drop the last
+    few hook writes, but never corrupts the DB.
+    """
+    global _CONN, _FTS_OK
+    if _CONN is not None:
+        return _CONN
+
+    try:
+        conn = sqlite3.connect(str(DB_PATH), cached_statements=256)
+    except sqlite3.OperationalError:
+        # First run: create the memory dir only when the open actually fails,
+        # so the usual case makes no extra filesystem call
+        MEMORY_DIR.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(DB_PATH), cached_statements=256)
+    _CONN = conn
+    conn.executescript(_PRAGMAS)
+    # Checked before trusting user_version: memory.db is synced between
+    # machines, and one set up with FTS5 can be opened by a build without it
+    _FTS_OK = bool(conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+    # The version lives in the DB header, so it travels with memory.db on sync
+    if _FTS_OK and conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return conn
+
+    conn.executescript(_SCHEMA_DDL)
+    if not _FTS_OK:
+        conn.executescript(_FTS_DROP_DDL)
+        return conn
+    fts_synced = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'nodes_fts_ai'"
+    ).fetchone()
+    try:
+        conn.executescript(_FTS_DDL)
+    except sqlite3.OperationalError:
+        # FTS5 reported but unusable: same as without it, and user_version
+        # stays unset so a later open finishes the schema
+        conn.rollback()
+        _FTS_OK = False
+        conn.executescript(_FTS_DROP_DDL)
+        return conn
+    if not fts_synced:
+        # Index rows stored before the FTS table existed, or while a build
+        # without FTS5 had the triggers dropped
+        conn.execute("INSERT INTO nodes_fts(nodes_fts) VALUES ('rebuild')")
+    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
     conn.commit()
     return conn
 
 
-def fast_query(search_term: str, limit: int = 5, node_type: str = None):
-    conn = _ensure_db()
-    sql = "SELECT id, node_type, content, importance, access_count FROM nodes WHERE agent_id = ?"
-    params = [AGENT_ID]
+def _fts_match(words: list[str]) -> str:
+    """Build an FTS5 MATCH string OR-ing ``words`` as quoted terms."""
+    return " OR ".join('"' + w.replace('"', '""') + '"' for w in words)
 
-    if search_term:
-        words = search_term.lower().split()[:5]
-        word_clauses = []
-        for w in words:
-            word_clauses.append("LOWER(content) LIKE ?")
-            params.append(f"%{w}%")
-        if word_clauses:
-            sql += " AND (" + " OR ".join(word_clauses) + ")"
 
+# UPDATE ... RETURNING and AS MATERIALIZED need SQLite 3.35+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# How long a search waits for the write lock to bump access counts before
+# serving a plain read instead, vs. sqlite3.connect()'s default 5 s wait
+_BUMP_BUSY_MS = 200
+_BUSY_MS = 5000
+
+# fast_query_rows statements by shape; built once per process by _query_sql()
+_QUERY_SQL_CACHE: dict[tuple, str] = {}
+
+
+def _query_sql(fts: bool, n_like: int, has_type: bool, truncate: bool, bump: bool) -> str:
+    """Return the fast_query_rows statement for one query shape.
+
+    Identical text per shape keeps the connection's statement cache hitting.
+    With ``bump`` and RETURNING support the ranked lookup and the access bump
+    are one UPDATE whose rows lead with their rank position; parameters are
+    [match], agent_id, [like...], [node_type], limit, now, [max_chars].
+    Otherwise it is the plain ranked SELECT, with parameters
+    [match], [max_chars], agent_id, [like...], [node_type], limit.
+    """
+    returning = bump and _HAS_RETURNING
+    key = (fts, n_like, has_type, truncate, returning)
+    sql = _QUERY_SQL_CACHE.get(key)
+    if sql is not None:
+        return sql
+
+    if fts:
+        # Resolve the MATCH in a CTE first so the planner keeps the FTS index
+        match_cte = "m AS (SELECT rowid, bm25(nodes_fts) AS s FROM nodes_fts WHERE nodes_fts MATCH ?)"
+        source = "FROM m JOIN nodes n ON n.rowid = m.rowid WHERE n.agent_id = ?"
+        order = "m.s, n.importance DESC, n.access_count DESC"
+    else:
+        match_cte = ""
+        source = "FROM nodes n WHERE n.agent_id = ?"
+        if n_like:
+            source += " AND (" + " OR ".join(["n.content LIKE ?"] * n_like) + ")"
+        order = "n.importance DESC, n.access_count DESC"
+    if has_type:
+        source += " AND n.node_type = ?"
+
+    if returning:
+        # Callers that only print a prefix skip moving whole content values into Python
+        content_col = "substr(content, 1, ?)" if truncate else "content"
+        # RETURNING order is unspecified, so each row carries its rank from top
+        sql = (
+            f"WITH {match_cte + ', ' if match_cte else ''}top AS MATERIALIZED ("
+            f"SELECT n.rowid AS rid, row_number() OVER (ORDER BY {order}) AS pos "
+            f"{source} ORDER BY {order} LIMIT ?) "
+            "UPDATE nodes SET access_count = access_count + 1, accessed_at = ? "
+            "WHERE rowid IN (SELECT rid FROM top) "
+            "RETURNING (SELECT pos FROM top WHERE rid = nodes.rowid), "
+            # RETURNING skips REAL affinity: 1.0 would come back as int 1
+            f"id, node_type, {content_col}, CAST(importance AS REAL), access_count - 1"
+        )
+    else:
+        content_col = "substr(n.content, 1, ?)" if truncate else "n.content"
+        sql = (
+            f"{'WITH ' + match_cte + ' ' if match_cte else ''}"
+            f"SELECT n.id, n.node_type, {content_col}, n.importance, n.access_count "
+            f"{source} ORDER BY {order} LIMIT ?"
+        )
+    _QUERY_SQL_CACHE[key] = sql
+    return sql
+
+
+def fast_query_rows(search_term: str, limit: int = 5, node_type: str = None, max_chars: int = None):
+    """Keyword search over nodes that also bumps each hit's access count.
+
+    ``max_chars`` truncates content inside SQLite. Returns raw
+    ``(id, node_type, content, importance, access_count)`` tuples, with the
+    access count as it was before this lookup, for print-only callers;
+    JSON callers use fast_query_dicts().
+    """
+    from datetime import datetime
+
+    conn = _ensure_db()
+    # Only the first five words are used; stop splitting a long prompt there.
+    # Case folding is left to SQLite (the FTS tokenizer, or LIKE itself)
+    words = search_term.split(None, 5)[:5] if search_term else []
+    fts = bool(words) and _FTS_OK
+    like = [] if fts else [f"%{w}%" for w in words]
+    shape = (fts, len(like), bool(node_type), bool(max_chars))
+
+    params = [_fts_match(words)] if fts else []
+    params.append(AGENT_ID)
+    params += like
     if node_type:
-        sql += " AND node_type = ?"
         params.append(node_type)
-
-    sql += " ORDER BY importance DESC, access_count DESC LIMIT ?"
     params.append(limit)
+    select_params = list(params)
+    if max_chars:
+        select_params.insert(1 if fts else 0, max_chars)
+    now = datetime.now().isoformat()
+
+    conn.execute(f"PRAGMA busy_timeout={_BUMP_BUSY_MS}")
+    try:
+        if _HAS_RETURNING:
+            # Lookup and access bump in a single statement
+            params.append(now)
+            if max_chars:
+                params.append(max_chars)
+            rows = sorted(conn.execute(_query_sql(*shape, bump=True), params))
+            conn.commit()
+            return [r[1:] for r in rows]
+
+        # SELECT + access bump share one transaction; IMMEDIATE avoids a
+        # read-to-write lock upgrade failing under a concurrent writer
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(_query_sql(*shape, bump=False), select_params).fetchall()
+        if rows:
+            # One UPDATE for every hit instead of one per row
+            conn.execute(
+                "UPDATE nodes SET access_count = access_count + 1, accessed_at = ? "
+                f"WHERE id IN ({','.join('?' * len(rows))})",
+                [now] + [r[0] for r in rows],
+            )
+        conn.commit()
+        return rows
+    except sqlite3.OperationalError as e:
+        if "locked" not in str(e):
+            raise
+        conn.rollback()
+    finally:
+        conn.execute(f"PRAGMA busy_timeout={_BUSY_MS}")
+
+    # A writer (session-end, a store, cleanup's VACUUM) holds the lock: serve
+    # a plain WAL read and skip this call's access bump rather than let the
+    # hook run into its deadline
+    return conn.execute(_query_sql(*shape, bump=False), select_params).fetchall()
+
+
+_QUERY_KEYS = ("id", "type", "content", "importance", "access_count")
+
+
+def fast_query_dicts(search_term: str, limit: int = 5, node_type: str = None):
+    return [dict(zip(_QUERY_KEYS, r)) for r in fast_query_rows(search_term, limit, node_type)]
 
-    rows = conn.execute(sql, params).fetchall()
-    conn.close()
-    return [
-        {"id": r[0], "type": r[1], "content": r[2], "importance": r[3], "access_count": r[4]}
-        for r in rows
-    ]
+
+_EMPTY_META = "{}"
+
+
+def _meta_json(metadata: dict | None) -> str:
+    """Compact metadata JSON; the common no-metadata case skips the encoder."""
+    return json.dumps(metadata, separators=(",", ":")) if metadata else _EMPTY_META
+
+
+def _new_id() -> str:
+    """12-char node id: 48 random bits as hex, no uuid import or formatting."""
+    return os.urandom(6).hex()
+
+
+# One shared string so the connection's statement cache reuses the parsed INSERT
+_INSERT_NODE_SQL = (
+    "INSERT INTO nodes (id, agent_id, node_type, content, metadata, importance, created_at, accessed_at, access_count) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)"
+)
 
 
 def fast_store(content: str, node_type: str = "fact", importance: float = 0.5,
                metadata: dict = None):
-    # PII check
-    if contains_pii(content):
-        content = sanitize(content)
+    from datetime import datetime
+
+    content = sanitize(content)  # PII redaction
 
     conn = _ensure_db()
-    node_id = str(uuid4())[:12]
+    node_id = _new_id()
     now = datetime.now().isoformat()
-    meta_json = json.dumps(metadata or {})
+    meta_json = _meta_json(metadata)
 
     conn.execute(
-        "INSERT INTO nodes (id, agent_id, node_type, content, metadata, importance, created_at, accessed_at, access_count) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
-        (node_id, AGENT_ID, node_type, content, meta_json, importance, now, now),
+        _INSERT_NODE_SQL, (node_id, AGENT_ID, node_type, content, meta_json, importance, now, now)
     )
     conn.commit()
-    conn.close()
     return node_id
 
 
-def fast_stats():
+def fast_store_many(items: list[tuple]):
+    """Store many (content, node_type, importance, metadata) items in one transaction."""
+    if not items:
+        return []
+    from datetime import datetime
+
     conn = _ensure_db()
-    total = conn.execute("SELECT COUNT(*) FROM nodes WHERE agent_id = ?", (AGENT_ID,)).fetchone()[0]
-    total_rel = conn.execute("SELECT COUNT(*) FROM relations WHERE agent_id = ?", (AGENT_ID,)).fetchone()[0]
+    now = datetime.now().isoformat()  # one instant for the whole batch
+    rows = []
+    for content, node_type, importance, metadata in items:
+        content = sanitize(content)
+        rows.append((_new_id(), AGENT_ID, node_type, content,
+                     _meta_json(metadata), importance, now, now))
+
+    conn.execute("BEGIN IMMEDIATE")
+    conn.executemany(_INSERT_NODE_SQL, rows)
+    conn.commit()
+    return [r[0] for r in rows]
 
-    types = {}
-    for row in conn.execute(
-        "SELECT node_type, COUNT(*) FROM nodes WHERE agent_id = ? GROUP BY node_type", (AGENT_ID,)
-    ).fetchall():
-        types[row[0]] = row[1]
 
-    # DB file size
-    db_size = 0
-    if DB_PATH.exists():
-        db_size = DB_PATH.stat().st_size
+def fast_stats():
+    conn = _ensure_db()
+    # One round-trip: the NULL-type row is the relation total (node_type is
+    # NOT NULL); the node total is summed from the per-type counts rather than
+    # scanning nodes a second time
+    total_rel = 0
+    types = {}
+    for node_type, count in conn.execute(
+        "SELECT NULL, COUNT(*) FROM relations WHERE agent_id = ? "
+        "UNION ALL SELECT node_type, COUNT(*) FROM nodes WHERE agent_id = ? GROUP BY node_type",
+        (AGENT_ID, AGENT_ID),
+    ):
+        if node_type is None:
+            total_rel = count
+        else:
+            types[node_type] = count
+    total = sum(types.values())
+
+    # DB file size; the open above guarantees the file exists
+    db_size = DB_PATH.stat().st_size
 
-    conn.close()
     return {
         "agent_id": AGENT_ID,
         "total_nodes": total,
@@ -188,20 +496,25 @@ def fast_stats():
 
 # ── Command Handlers ──────────────────────────────────────────────────────────
 
+def _print_json(obj, pretty: bool = False):
+    """Print compact JSON for the hooks parsing it; indented only on --pretty."""
+    print(json.dumps(obj, indent=2) if pretty else json.dumps(obj, separators=(",", ":")))
+
+
 def cmd_context(args):
     if args.fast:
-        results = fast_query(args.query, limit=args.limit or 5)
+        results = fast_query_rows(args.query, limit=args.limit or 5, max_chars=200)
     else:
         try:
             from memory.graph_memory import GraphMemory
             mem = GraphMemory(agent_id=AGENT_ID)
             nodes = mem.query(search_term=args.query, limit=args.limit or 5)
             results = [
-                {"type": n.node_type.value, "content": n.content[:200], "importance": n.importance}
+                (None, n.node_type.value, n.content[:200], n.importance, None)
                 for n in nodes
             ]
         except ImportError:
-            results = fast_query(args.query, limit=args.limit or 5)
+            results = fast_query_rows(args.query, limit=args.limit or 5, max_chars=200)
 
     if not results:
         print(f"[memory] No relevant context found for: {args.query}")
@@ -210,9 +523,8 @@ def cmd_context(args):
     print(f"[MEMORY CONTEXT] {len(results)} relevant memories for: {args.query}")
     print("---")
     for r in results:
-        t = r["type"].upper()
-        imp = f"imp={r['importance']:.1f}" if r.get("importance") else ""
-        print(f"[{t}] {imp} {r['content'][:200]}")
+        imp = f"imp={r[3]:.1f}" if r[3] else ""
+        print(f"[{r[1].upper()}] {imp} {r[2][:200]}")
     print("---")
 
 
@@ -224,13 +536,25 @@ def cmd_store(args):
 
 
 def cmd_search(args):
-    results = fast_query(args.query, limit=args.limit or 10)
-    print(json.dumps({"count": len(results), "results": results}, indent=2))
+    results = fast_query_dicts(args.query, limit=args.limit or 10)
+    _print_json({"count": len(results), "results": results}, args.pretty)
 
 
 def cmd_stats(args):
-    stats = fast_stats()
-    print(json.dumps(stats, indent=2))
+    _print_json(fast_stats(), args.pretty)
+
+
+# session-end insight key -> stored node_type / importance
+_SESSION_TYPE_MAP = {
+    "what_worked": "pattern", "what_failed": "error",
+    "patterns_found": "pattern", "gotchas": "error",
+    "recommendations": "decision", "subtasks_completed": "task",
+}
+_SESSION_IMPORTANCE_MAP = {
+    "what_worked": 0.8, "what_failed": 0.7,
+    "patterns_found": 0.9, "gotchas": 0.8,
+    "recommendations": 0.7, "subtasks_completed": 0.5,
+}
 
 
 def cmd_session_end(args):
@@ -242,66 +566,62 @@ def cmd_session_end(args):
             print("[memory] Error: invalid JSON for --json", file=sys.stderr)
             return
 
-    stored = 0
+    batch = []
     for key, items in insights.items():
         if isinstance(items, list):
-            for item in items:
-                type_map = {
-                    "what_worked": "pattern", "what_failed": "error",
-                    "patterns_found": "pattern", "gotchas": "error",
-                    "recommendations": "decision", "subtasks_completed": "task",
-                }
-                importance_map = {
-                    "what_worked": 0.8, "what_failed": 0.7,
-                    "patterns_found": 0.9, "gotchas": 0.8,
-                    "recommendations": 0.7, "subtasks_completed": 0.5,
-                }
-                fast_store(
-                    content=str(item),
-                    node_type=type_map.get(key, "fact"),
-                    importance=importance_map.get(key, 0.5),
-                    metadata={"source": "session-end", "insight_type": key},
-                )
-                stored += 1
+            node_type = _SESSION_TYPE_MAP.get(key, "fact")
+            importance = _SESSION_IMPORTANCE_MAP.get(key, 0.5)
+            meta = {"source": "session-end", "insight_type": key}
+            batch.extend((str(item), node_type, importance, meta) for item in items)
 
+    stored = len(fast_store_many(batch))
     print(json.dumps({"success": True, "stored": stored}))
 
 
+def _read_stdin(n: int) -> str:
+    """Read up to ``n`` bytes of piped stdin; "" for a terminal or unreadable stdin.
+
+    One read() on the raw fd, so the hook never drives the TextIOWrapper
+    decode loop.
+    """
+    try:
+        if sys.stdin.isatty():
+            return ""
+        return os.read(sys.stdin.fileno(), n).decode("utf-8", "replace")
+    except io.UnsupportedOperation:
+        # No fd behind it: the daemon hands over forwarded stdin as a StringIO
+        return sys.stdin.read(n)
+    except (OSError, ValueError):
+        return ""
+
+
 def cmd_pre_task(args):
     description = args.description or ""
     if not description:
-        try:
-            if not sys.stdin.isatty():
-                data = sys.stdin.read(2000)
-                try:
-                    tool_input = json.loads(data)
-                    description = tool_input.get("prompt", tool_input.get("description", ""))
-                except json.JSONDecodeError:
-                    description = data[:200]
-        except (OSError, ValueError):
-            pass
+        data = _read_stdin(2048)
+        if data:
+            try:
+                tool_input = json.loads(data)
+                description = tool_input.get("prompt", tool_input.get("description", ""))
+            except json.JSONDecodeError:
+                description = data[:200]
 
     if not description or len(description) < 5:
         return
 
-    results = fast_query(description, limit=3)
+    results = fast_query_rows(description, limit=3, max_chars=150)
     if not results:
         return
 
     print(f"\n[MEMORY CONTEXT -- {len(results)} relevant memories]")
     for r in results:
-        t = r["type"].upper()
-        print(f"  [{t}] {r['content'][:150]}")
+        print(f"  [{r[1].upper()}] {r[2][:150]}")
     print("[END MEMORY CONTEXT]\n")
 
 
 def cmd_post_task(args):
-    output_text = ""
-    try:
-        if not sys.stdin.isatty():
-            output_text = sys.stdin.read(2000)
-    except (OSError, ValueError):
-        pass
+    # Only the first 500 chars are kept; read just past that
+    output_text = _read_stdin(600)
 
     if not output_text or len(output_text) < 20:
         return
@@ -318,17 +638,27 @@ def cmd_post_task(args):
 # ── GEPA Commands ────────────────────────────────────────────────────────────
 
 def _has_gepa_columns() -> bool:
-    """Check if GEPA migration has been applied."""
+    """Check if GEPA migration has been applied.
+
+    Only a positive answer is cached: columns never disappear, but the JS
+    side can migrate the DB while a daemon is running.
+    """
+    global _GEPA_OK
+    if _GEPA_OK:
+        return True
     conn = _ensure_db()
-    cols = {row[1] for row in conn.execute("PRAGMA table_info(nodes)").fetchall()}
-    conn.close()
-    return "memory_layer" in cols
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(nodes)")}
+    _GEPA_OK = "memory_layer" in cols
+    return _GEPA_OK
 
 
 def cmd_migrate(args):
     """Run GEPA schema migration."""
+    global _GEPA_OK
     conn = _ensure_db()
-    cols = {row[1] for row in conn.execute("PRAGMA table_info(nodes)").fetchall()}
+    # ALTERs, DDL and classify UPDATEs all land in a single commit
+    conn.execute("BEGIN IMMEDIATE")
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(nodes)")}
 
     migrations = []
     gepa_columns = [
@@ -363,6 +693,11 @@ def cmd_migrate(args):
     conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_memory_layer ON nodes(memory_layer)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_fitness ON nodes(fitness)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_generation ON nodes(generation)")
+    # Partial index matching cmd_gepa_query's filter + ORDER BY
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_nodes_gepa_rank "
+        "ON nodes(agent_id, memory_layer, fitness DESC, importance DESC) WHERE deprecated_at IS NULL"
+    )
 
     # Auto-classify existing nodes
     if "memory_layer" not in cols:
@@ -379,12 +714,14 @@ def cmd_migrate(args):
         migrations.append(f"classified {constant_count} constant, {file_count} file")
 
     conn.commit()
-    conn.close()
+    _GEPA_OK = True
     print(json.dumps({"success": True, "migrations": migrations}))
 
 
 def cmd_gepa_store(args):
     """Store a node with GEPA layer classification."""
+    from datetime import datetime
+
     if not _has_gepa_columns():
         # Fallback to regular store
         fast_store(args.value, node_type=args.type, importance=args.importance or 0.5)
@@ -401,14 +738,12 @@ def cmd_gepa_store(args):
         elif args.type in ("pattern", "decision") and importance >= 0.8:
             layer = "constant"
 
-    content = args.value
-    if contains_pii(content):
-        content = sanitize(content)
+    content = sanitize(args.value)
 
     conn = _ensure_db()
-    node_id = str(uuid4())[:12]
+    node_id = _new_id()
     now = datetime.now().isoformat()
-    meta = json.dumps({"key": args.key, "source": "gepa-cli", "layer": layer})
+    meta = _meta_json({"key": args.key, "source": "gepa-cli", "layer": layer})
 
     conn.execute(
         "INSERT INTO nodes (id, agent_id, node_type, content, metadata, importance, "
@@ -417,7 +752,6 @@ def cmd_gepa_store(args):
         (node_id, AGENT_ID, args.type, content, meta, importance, now, now, layer, importance),
     )
     conn.commit()
-    conn.close()
     print(json.dumps({"success": True, "node_id": node_id, "layer": layer, "gepa": True}))
 
 
@@ -431,49 +765,29 @@ def cmd_fitness_update(args):
     max_age_days = getattr(args, 'max_age_days', 90) or 90
     layer_filter = getattr(args, 'layer', None)
 
-    # Get max access count for normalization
-    sql_max = "SELECT COALESCE(MAX(access_count), 1) FROM nodes"
-    params_max = []
-    if layer_filter:
-        sql_max += " WHERE memory_layer = ?"
-        params_max = [layer_filter]
-    max_access = conn.execute(sql_max, params_max).fetchone()[0] or 1
-
-    now = datetime.now()
-
-    sql = "SELECT id, importance, access_count, accessed_at FROM nodes"
-    params = []
-    if layer_filter:
-        sql += " WHERE memory_layer = ?"
-        params = [layer_filter]
-
-    rows = conn.execute(sql, params).fetchall()
-    updates = []
-
-    for node_id, importance, access_count, accessed_at in rows:
-        norm_access = access_count / max_access
-
-        try:
-            last_access = datetime.fromisoformat(accessed_at.replace('Z', '').split('+')[0])
-            days_since = (now - last_access).days
-        except (ValueError, TypeError):
-            days_since = 0
-
-        age_factor = max(0.0, 1.0 - (days_since / max_age_days))
-
-        inbound = conn.execute(
-            "SELECT COUNT(*) FROM relations WHERE target_id = ?", (node_id,)
-        ).fetchone()[0]
-        referral_factor = min(1.0, inbound / 5.0)
-
-        fitness = (0.3 * norm_access) + (0.3 * importance) + (0.2 * age_factor) + (0.2 * referral_factor)
-        fitness = round(fitness, 4)
-        updates.append((fitness, node_id))
-
-    conn.executemany("UPDATE nodes SET fitness = ? WHERE id = ?", updates)
+    # fitness = 0.3*norm_access + 0.3*importance + 0.2*age_factor + 0.2*referral,
+    # computed entirely inside SQLite. Only the 'YYYY-MM-DDTHH:MM:SS' head of
+    # accessed_at is used, so a trailing 'Z' / '+hh:mm' is ignored and the
+    # value is read as local time; unparseable timestamps count as age 0.
+    conn.execute("""
+        WITH ib AS (SELECT target_id, COUNT(*) AS c FROM relations
+                    WHERE target_id IN (SELECT id FROM nodes WHERE :layer IS NULL OR memory_layer = :layer)
+                    GROUP BY target_id),
+             mx AS (SELECT COALESCE(NULLIF(MAX(access_count), 0), 1) AS m FROM nodes
+                    WHERE :layer IS NULL OR memory_layer = :layer)
+        UPDATE nodes SET fitness = ROUND(
+            0.3 * (access_count * 1.0 / (SELECT m FROM mx)) +
+            0.3 * importance +
+            0.2 * MAX(0.0, 1.0 - COALESCE(CAST(
+                julianday('now', 'localtime') - julianday(substr(accessed_at, 1, 19))
+            AS INTEGER), 0) * 1.0 / :max_age) +
+            0.2 * MIN(1.0, COALESCE((SELECT c FROM ib WHERE ib.target_id = nodes.id), 0) / 5.0),
+        4)
+        WHERE :layer IS NULL OR memory_layer = :layer
+    """, {"layer": layer_filter, "max_age": max_age_days})
+    updated = conn.execute("SELECT changes()").fetchone()[0]
     conn.commit()
-    conn.close()
-    print(json.dumps({"updated": len(updates)}))
+    print(json.dumps({"updated": updated}))
 
 
 def cmd_reflect(args):
@@ -493,11 +807,9 @@ def cmd_reflect(args):
     checks["diversity"] = {"distinct_types": distinct_types, "quota": 3}
 
     # Check 2: Population
-    population = {}
-    for row in conn.execute(
+    population = dict(conn.execute(
         "SELECT memory_layer, COUNT(*) FROM nodes WHERE deprecated_at IS NULL GROUP BY memory_layer"
-    ).fetchall():
-        population[row[0]] = row[1]
+    ))
 
     # Check 3: Quarantine count
     quarantine_count = conn.execute(
@@ -505,7 +817,6 @@ def cmd_reflect(args):
         "AND deprecated_at IS NULL"
     ).fetchone()[0]
 
-    conn.close()
     print(json.dumps({
         "success": True,
         "checks": checks,
@@ -524,11 +835,9 @@ def cmd_promote(args):
     node_id = args.node_id
     row = conn.execute("SELECT memory_layer FROM nodes WHERE id = ?", (node_id,)).fetchone()
     if not row:
-        conn.close()
         print(json.dumps({"success": False, "error": "Node not found"}))
         return
     if row[0] == "constant":
-        conn.close()
         print(json.dumps({"success": False, "error": "Already constant"}))
         return
 
@@ -538,12 +847,13 @@ def cmd_promote(args):
         (row[0], node_id)
     )
     conn.commit()
-    conn.close()
     print(json.dumps({"success": True, "from": row[0], "to": "constant"}))
 
 
 def cmd_deprecate(args):
     """Soft-delete a node by setting deprecated_at."""
+    from datetime import datetime
+
     if not _has_gepa_columns():
         print(json.dumps({"success": False, "error": "GEPA not migrated"}))
         return
@@ -552,7 +862,6 @@ def cmd_deprecate(args):
     node_id = args.node_id
     row = conn.execute("SELECT id FROM nodes WHERE id = ?", (node_id,)).fetchone()
     if not row:
-        conn.close()
         print(json.dumps({"success": False, "error": "Node not found"}))
         return
 
@@ -561,7 +870,6 @@ def cmd_deprecate(args):
         (datetime.now().isoformat(), node_id)
     )
     conn.commit()
-    conn.close()
     print(json.dumps({"success": True}))
 
 
@@ -590,30 +898,40 @@ def cmd_quarantine_check(args):
             continue
         if current_cycle >= q_cycle:
             if fitness >= min_fitness:
-                conn.execute(
-                    "UPDATE nodes SET memory_layer = 'constant', promoted_from = 'mutating', "
-                    "quarantine_until = NULL, version = version + 1 WHERE id = ?",
-                    (node_id,)
-                )
                 promoted.append({"id": node_id, "fitness": fitness})
             else:
-                conn.execute("UPDATE nodes SET quarantine_until = NULL WHERE id = ?", (node_id,))
                 failed.append({"id": node_id, "fitness": fitness})
 
+    # One UPDATE per outcome, ids passed as a JSON array instead of a query per node
+    if promoted:
+        conn.execute(
+            "UPDATE nodes SET memory_layer = 'constant', promoted_from = 'mutating', "
+            "quarantine_until = NULL, version = version + 1 "
+            "WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps([p["id"] for p in promoted]),)
+        )
+    if failed:
+        conn.execute(
+            "UPDATE nodes SET quarantine_until = NULL WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps([f["id"] for f in failed]),)
+        )
+
     conn.commit()
-    conn.close()
     print(json.dumps({"promoted": promoted, "failed": failed, "pending": len(quarantined) - len(promoted) - len(failed)}))
 
 
 def cmd_gepa_query(args):
     """Query nodes filtered by GEPA layer."""
     if not _has_gepa_columns():
-        results = fast_query(args.query, limit=args.limit or 5)
+        results = fast_query_dicts(args.query, limit=args.limit or 5)
         print(json.dumps({"results": results, "gepa": False}))
         return
 
     conn = _ensure_db()
-    sql = "SELECT id, node_type, content, importance, memory_layer, fitness FROM nodes WHERE agent_id = ?"
+    sql = (
+        "SELECT id, node_type AS type, content, importance, memory_layer AS layer, fitness FROM nodes "
+        "WHERE agent_id = ? AND deprecated_at IS NULL"
+    )
     params = [AGENT_ID]
 
     if args.layer:
@@ -621,8 +939,10 @@ def cmd_gepa_query(args):
         params.append(args.layer)
 
     if args.query:
-        words = args.query.lower().split()[:5]
-        word_clauses = ["LOWER(content) LIKE ?" for w in words]
+        # At most 5 splits: a long query is never tokenized past what is used.
+        # LIKE is already ASCII case-insensitive, same folding LOWER() did
+        words = args.query.split(None, 5)[:5]
+        word_clauses = ["content LIKE ?" for w in words]
         params.extend(f"%{w}%" for w in words)
         if word_clauses:
             sql += " AND (" + " OR ".join(word_clauses) + ")"
@@ -630,19 +950,136 @@ def cmd_gepa_query(args):
     sql += " ORDER BY fitness DESC, importance DESC LIMIT ?"
     params.append(args.limit or 10)
 
-    rows = conn.execute(sql, params).fetchall()
-    conn.close()
-
-    results = [
-        {"id": r[0], "type": r[1], "content": r[2], "importance": r[3], "layer": r[4], "fitness": r[5]}
-        for r in rows
-    ]
+    # sqlite3.Row on this cursor only; dict(row) keys come from the column aliases
+    cur = conn.cursor()
+    cur.row_factory = sqlite3.Row
+    results = [dict(r) for r in cur.execute(sql, params)]
     print(json.dumps({"results": results, "count": len(results), "gepa": True}, indent=2))
 
 
+# ── Daemon ───────────────────────────────────────────────────────────────────
+
+def _serve_request(req) -> dict:
+    """Run one forwarded CLI invocation, capturing its output and exit code."""
+    from contextlib import redirect_stderr, redirect_stdout
+
+    # Any client can connect: reject a malformed request here rather than let
+    # an AttributeError/TypeError escape and take the daemon down
+    argv = req.get("argv") if isinstance(req, dict) else None
+    stdin = req.get("stdin") if isinstance(req, dict) else None
+    if (
+        not isinstance(argv, list)
+        or not all(isinstance(a, str) for a in argv)
+        or not isinstance(stdin, (str, type(None)))
+    ):
+        return {"code": 2, "stdout": "", "stderr": "[memory-cli] Error: malformed daemon request\n"}
+    if argv[:1] == ["daemon"]:
+        return {"code": 1, "stdout": "", "stderr": "[memory-cli] Error: daemon is already running\n"}
+
+    out, err = io.StringIO(), io.StringIO()
+    code = 0
+    # In-memory stdin: a pipe would block this single-threaded loop on a
+    # payload larger than its buffer. _read_stdin() reads it without an fd.
+    saved_stdin = sys.stdin
+    sys.stdin = io.StringIO(stdin or "")
+    try:
+        with redirect_stdout(out), redirect_stderr(err):
+            try:
+                main(argv)
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        sys.stdin.close()
+        sys.stdin = saved_stdin
+        # A failed handler may leave a transaction open on the shared connection
+        if _CONN is not None and _CONN.in_transaction:
+            _CONN.rollback()
+    return {"code": code, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+
+def cmd_daemon(args):
+    """Serve CLI invocations over a UNIX socket from one long-lived process.
+
+    Each connection sends one JSON line ``{"argv": [...], "stdin": "..."}``
+    and receives ``{"code": N, "stdout": "...", "stderr": "..."}``. The
+    interpreter, imports and compiled state stay warm across requests, so
+    hooks skip start-up (see memory-cli-client.py); the DB itself is reopened
+    per request, since a git pull may swap memory.db in between. The daemon
+    exits after ``--idle-timeout`` seconds without a request, or once this
+    file changes on disk so upgrades take effect.
+    """
+    import signal
+    import socket
+
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    if fcntl is None or not hasattr(socket, "AF_UNIX"):
+        print("[memory-cli] Error: daemon mode needs UNIX domain sockets", file=sys.stderr)
+        sys.exit(1)
+
+    # One daemon per memory dir, even when two cold clients spawn daemons at
+    # once. The lock is on the directory itself, so there is no lock file for
+    # the memory repo to commit, and it is released when the process dies.
+    MEMORY_DIR.mkdir(parents=True, exist_ok=True)
+    lock_fd = os.open(str(MEMORY_DIR), os.O_RDONLY)
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(lock_fd)
+        return
+
+    # Holding the lock, any socket left behind is from a daemon that died
+    try:
+        SOCKET_PATH.unlink()
+    except OSError:
+        pass
+
+    # Exit through the finally/atexit path on kill so the socket is removed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    script_mtime = Path(__file__).stat().st_mtime
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        srv.bind(str(SOCKET_PATH))
+        os.chmod(SOCKET_PATH, 0o600)
+        srv.listen(16)
+        srv.settimeout(args.idle_timeout)
+        while True:
+            try:
+                client, _ = srv.accept()
+            except socket.timeout:
+                break
+            with client:
+                client.settimeout(10)
+                try:
+                    req = json.loads(client.makefile("rb").readline() or b"{}")
+                    resp = _serve_request(req)
+                    client.sendall(json.dumps(resp).encode("utf-8") + b"\n")
+                except (OSError, ValueError):
+                    pass
+            # Close the DB between requests: hook-runner's git pull can replace
+            # memory.db, and a connection held across it would keep writing to
+            # the old inode (and its WAL). Closing also checkpoints the WAL
+            # into memory.db, so git snapshots see every write.
+            _close_db()
+            if Path(__file__).stat().st_mtime != script_mtime:
+                break
+    finally:
+        srv.close()
+        # Unlink before releasing the lock, so it never hits a successor's socket
+        try:
+            SOCKET_PATH.unlink()
+        except OSError:
+            pass
+        os.close(lock_fd)
+
+
 # ── Main ──────────────────────────────────────────────────────────────────────
 
-def main():
+def _build_parser():
+    import argparse
+
     parser = argparse.ArgumentParser(description="Memory CLI for hook integration")
     parser.add_argument("--fast", action="store_true", help="Fast SQLite-only mode")
     sub = parser.add_subparsers(dest="command")
@@ -662,9 +1099,11 @@ def main():
     p_search = sub.add_parser("search")
     p_search.add_argument("query")
     p_search.add_argument("--limit", type=int, default=10)
+    p_search.add_argument("--pretty", action="store_true", help="Indent the JSON output")
     p_search.add_argument("--fast", action="store_true")
 
     p_stats = sub.add_parser("stats")
+    p_stats.add_argument("--pretty", action="store_true", help="Indent the JSON output")
     p_stats.add_argument("--fast", action="store_true")
 
     p_end = sub.add_parser("session-end")
@@ -717,22 +1156,73 @@ def main():
     p_qcheck.add_argument("--cycle", type=int, default=0)
     p_qcheck.add_argument("--fast", action="store_true")
 
-    args = parser.parse_args()
+    p_daemon = sub.add_parser("daemon")
+    p_daemon.add_argument("--idle-timeout", type=int, default=600)
 
-    if args.command in FAST_COMMANDS:
-        args.fast = True
+    return parser
 
-    handlers = {
-        "context": cmd_context, "store": cmd_store, "search": cmd_search,
-        "stats": cmd_stats, "session-end": cmd_session_end,
-        "pre-task": cmd_pre_task, "post-task": cmd_post_task,
-        "migrate": cmd_migrate, "gepa-store": cmd_gepa_store,
-        "gepa-query": cmd_gepa_query, "fitness-update": cmd_fitness_update,
-        "reflect": cmd_reflect, "promote": cmd_promote,
-        "deprecate": cmd_deprecate, "quarantine-check": cmd_quarantine_check,
-    }
 
-    handler = handlers.get(args.command)
+# Value-taking options each hook command accepts, for _parse_fast_args
+_FAST_OPTIONS = {
+    "pre-task": ("--description",),
+    "post-task": (),
+    "session-end": ("--json",),
+}
+
+
+def _parse_fast_args(argv: list[str]):
+    """Hand-parse a FAST_COMMANDS invocation without building the argparse tree.
+
+    Returns None for anything outside the exact hook grammar (abbreviations,
+    unknown flags, -h) so argparse can handle or reject it as before.
+    """
+    command = argv[0]
+    values = {"command": command, "fast": True, "description": "", "json": None}
+    options = _FAST_OPTIONS[command]
+    i = 1
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--fast":
+            i += 1
+            continue
+        name, eq, value = arg.partition("=")
+        if name not in options:
+            return None
+        if not eq:
+            if i + 1 >= len(argv):
+                return None
+            i += 1
+            value = argv[i]
+        values[name[2:]] = value
+        i += 1
+    return SimpleNamespace(**values)
+
+
+_HANDLERS = {
+    "context": cmd_context, "store": cmd_store, "search": cmd_search,
+    "stats": cmd_stats, "session-end": cmd_session_end,
+    "pre-task": cmd_pre_task, "post-task": cmd_post_task,
+    "migrate": cmd_migrate, "gepa-store": cmd_gepa_store,
+    "gepa-query": cmd_gepa_query, "fitness-update": cmd_fitness_update,
+    "reflect": cmd_reflect, "promote": cmd_promote,
+    "deprecate": cmd_deprecate, "quarantine-check": cmd_quarantine_check,
+    "daemon": cmd_daemon,
+}
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    parser = None
+    args = _parse_fast_args(argv) if argv[:1] and argv[0] in FAST_COMMANDS else None
+    if args is None:
+        parser = _build_parser()
+        args = parser.parse_args(argv)
+        if args.command in FAST_COMMANDS:
+            args.fast = True
+
+    handler = _HANDLERS.get(args.command)
     if handler:
         try:
             handler(args)
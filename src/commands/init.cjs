@@ -73,9 +73,8 @@ conn.execute("""
         created_at TEXT NOT NULL
     )
 """)
-conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_agent ON nodes(agent_id)")
 conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_type ON nodes(node_type)")
-conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_importance ON nodes(importance)")
+conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_rank ON nodes(agent_id, importance DESC, access_count DESC)")
 conn.execute("CREATE INDEX IF NOT EXISTS idx_relations_source ON relations(source_id)")
 conn.execute("CREATE INDEX IF NOT EXISTS idx_relations_target ON relations(target_id)")
 conn.commit()
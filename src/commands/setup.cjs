@@ -33,6 +33,7 @@ const HOOK_FILES = [
   'memory-bridge.cjs',
   'memory-hook.cjs',
   'memory-cli.py',
+  'memory-cli-client.py',
   'inherit-params.cjs',
   'inherit-params.ps1',
 ];
@@ -50,7 +50,7 @@ function status(flags) {
   const settingsPath = getGlobalSettingsPath();
   const manifest = readManifest(getManifestPath());
 
-  const hookFiles = ['hook-runner.cjs', 'memory-bridge.cjs', 'memory-hook.cjs', 'memory-cli.py', 'inherit-params.cjs'];
+  const hookFiles = ['hook-runner.cjs', 'memory-bridge.cjs', 'memory-hook.cjs', 'memory-cli.py', 'memory-cli-client.py', 'inherit-params.cjs'];
   const installedHooks = hookFiles.filter(f => fileExists(path.join(hooksDir, f)));
 
   result.global = {
@@ -53,6 +53,7 @@ function uninstall(flags) {
     'memory-bridge.cjs',
     'memory-hook.cjs',
     'memory-cli.py',
+    'memory-cli-client.py',
     'inherit-params.cjs',
     'inherit-params.ps1',
   ];
@@ -150,6 +150,12 @@ vacuumed = False
 if not dry_run and deleted:
     conn.execute("VACUUM")
     vacuumed = True
+    # VACUUM may renumber nodes rowids; resync the FTS index keyed on them
+    try:
+        conn.execute("INSERT INTO nodes_fts(nodes_fts) VALUES ('rebuild')")
+        conn.commit()
+    except sqlite3.OperationalError:
+        pass
 
 conn.close()
 print(json.dumps({"deleted": len(deleted), "vacuumed": vacuumed, "entries": deleted}))
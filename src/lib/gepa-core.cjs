@@ -136,6 +136,10 @@ conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_memory_layer ON nodes(memory_
 conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_fitness ON nodes(fitness)")
 conn.execute("CREATE INDEX IF NOT EXISTS idx_nodes_generation ON nodes(generation)")
 conn.execute("CREATE INDEX IF NOT EXISTS idx_gepa_events_type ON gepa_events(event_type)")
+conn.execute(
+    "CREATE INDEX IF NOT EXISTS idx_nodes_gepa_rank "
+    "ON nodes(agent_id, memory_layer, fitness DESC, importance DESC) WHERE deprecated_at IS NULL"
+)
 
 # Auto-classify existing nodes
 if "memory_layer" in [m.split(".")[-1] for m in migrations if "nodes." in m]:
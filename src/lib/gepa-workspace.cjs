@@ -132,7 +132,6 @@ function importConstant(projectRoot, snapshotPath) {
   const script = `
 import sqlite3, json
 from datetime import datetime
-from uuid import uuid4
 
 db_path = ${JSON.stringify(dbPath.replace(/\\/g, '/'))}
 entries = ${JSON.stringify(snapshot.entries)}
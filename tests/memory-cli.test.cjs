@@ -0,0 +1,254 @@
+#!/usr/bin/env node
+/**
+ * Tests for hooks/memory-cli.py — the SQLite CLI behind the memory hooks
+ * Validates: fast-path arg parsing, FTS and LIKE search, session-end batching,
+ * fitness-update, PII redaction, daemon round-trip via memory-cli-client.py
+ */
+
+'use strict';
+
+const { describe, it, before, after } = require('node:test');
+const assert = require('node:assert/strict');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const net = require('net');
+const { execFileSync, spawn } = require('child_process');
+
+const { detectPython } = require('../src/lib/python-detector.cjs');
+
+const python = detectPython();
+const skipPython = !python.available;
+
+const CLI = path.join(__dirname, '..', 'hooks', 'memory-cli.py');
+const CLIENT = path.join(__dirname, '..', 'hooks', 'memory-cli-client.py');
+
+// memory-cli.py treats a CWD containing .claude as the project root
+function makeProject() {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'mcli-'));
+  fs.mkdirSync(path.join(dir, '.claude'));
+  return dir;
+}
+
+function cli(dir, args, opts = {}) {
+  return execFileSync(python.command, [CLI, ...args], {
+    cwd: dir, encoding: 'utf-8', input: opts.input || '', timeout: 15000,
+  });
+}
+
+function cliJson(dir, args) {
+  return JSON.parse(cli(dir, args));
+}
+
+// Run a snippet against the project's memory.db; argv[1] is the DB path
+function sql(dir, code, ...args) {
+  const db = path.join(dir, '.claude-memory', 'db', 'memory.db');
+  return execFileSync(python.command, ['-c', `import json, sqlite3, sys\nconn = sqlite3.connect(sys.argv[1])\n${code}`, db, ...args], {
+    encoding: 'utf-8', timeout: 15000,
+  });
+}
+
+function sleep(ms) {
+  Atomics.wait(new Int32Array(new SharedArrayBuffer(4)), 0, 0, ms);
+}
+
+describe('memory-cli argument parsing', { skip: skipPython && 'Python not available' }, () => {
+  let dir;
+  before(() => {
+    dir = makeProject();
+    cli(dir, ['store', 'k1', 'the kernel scheduler uses CFS']);
+  });
+  after(() => fs.rmSync(dir, { recursive: true, force: true }));
+
+  it('serves the exact hook grammar on the fast path', () => {
+    const out = cli(dir, ['pre-task', '--description', 'kernel scheduler', '--fast']);
+    assert.match(out, /\[MEMORY CONTEXT -- 1 relevant memories\]/);
+    assert.match(out, /\[FACT\] the kernel scheduler uses CFS/);
+  });
+
+  it('accepts --option=value on the fast path', () => {
+    const out = cliJson(dir, ['session-end', '--json={"what_worked": ["fast path eq form"]}']);
+    assert.deepEqual(out, { success: true, stored: 1 });
+  });
+
+  it('falls through to argparse for abbreviated options', () => {
+    const out = cli(dir, ['pre-task', '--desc', 'kernel scheduler']);
+    assert.match(out, /\[FACT\] the kernel scheduler uses CFS/);
+  });
+
+  it('falls through to argparse for unknown options', () => {
+    assert.throws(() => cli(dir, ['pre-task', '--bogus']), (err) => {
+      assert.equal(err.status, 2);
+      assert.match(err.stderr, /unrecognized arguments: --bogus/);
+      return true;
+    });
+  });
+});
+
+describe('memory-cli store and search', { skip: skipPython && 'Python not available' }, () => {
+  let dir;
+  before(() => { dir = makeProject(); });
+  after(() => fs.rmSync(dir, { recursive: true, force: true }));
+
+  it('finds a stored node through FTS', () => {
+    const stored = cliJson(dir, ['store', 'sched', 'the kernel scheduler uses CFS', '--type', 'decision']);
+    assert.equal(stored.success, true);
+
+    const res = cliJson(dir, ['search', 'Kernel']);
+    assert.equal(res.count, 1);
+    assert.equal(res.results[0].id, stored.node_id);
+    assert.equal(res.results[0].type, 'decision');
+  });
+
+  it('finds a stored node through the LIKE fallback', () => {
+    // Open the DB, then force the no-FTS5 path. FTS matches whole tokens, so
+    // only the LIKE scan finds the mid-word "ernel"
+    const script = [
+      'import importlib.util, sys',
+      'spec = importlib.util.spec_from_file_location("memory_cli", sys.argv[1])',
+      'm = importlib.util.module_from_spec(spec)',
+      'spec.loader.exec_module(m)',
+      'm._ensure_db()',
+      'm._FTS_OK = False',
+      'm.main(sys.argv[2:])',
+    ].join('\n');
+    const out = execFileSync(python.command, ['-c', script, CLI, 'search', 'ernel'], {
+      cwd: dir, encoding: 'utf-8', timeout: 15000,
+    });
+    const res = JSON.parse(out);
+    assert.equal(res.count, 1);
+    assert.equal(res.results[0].content, 'the kernel scheduler uses CFS');
+  });
+
+  it('stores a session-end batch with per-insight type and importance', () => {
+    const insights = {
+      what_worked: ['alpha approach worked'],
+      gotchas: ['beta gotcha bites', 'gamma gotcha bites'],
+      notes: 'not a list, skipped',
+    };
+    assert.deepEqual(cliJson(dir, ['session-end', '--json', JSON.stringify(insights)]), { success: true, stored: 3 });
+
+    const worked = cliJson(dir, ['search', 'alpha']).results;
+    assert.equal(worked.length, 1);
+    assert.equal(worked[0].type, 'pattern');
+    assert.equal(worked[0].importance, 0.8);
+
+    const gotchas = cliJson(dir, ['search', 'gotcha']).results;
+    assert.equal(gotchas.length, 2);
+    for (const r of gotchas) assert.equal(r.type, 'error');
+  });
+});
+
+describe('memory-cli PII redaction', { skip: skipPython && 'Python not available' }, () => {
+  let dir;
+  before(() => { dir = makeProject(); });
+  after(() => fs.rmSync(dir, { recursive: true, force: true }));
+
+  it('redacts secrets before they are stored', () => {
+    cli(dir, ['store', 'p1', "deploy uses password='hunter2secret'"]);
+    cli(dir, ['store', 'p2', `deploy token sk-${'a'.repeat(24)}`]);
+    // IGNORECASE matches U+017F as "s"; the prescreen must not skip it
+    cli(dir, ['store', 'p3', "deploy uses paſſword='hunter3secret'"]);
+
+    const res = cliJson(dir, ['search', 'deploy', '--limit', '10']);
+    assert.equal(res.count, 3);
+    for (const r of res.results) {
+      assert.match(r.content, /\[REDACTED\]/);
+      assert.doesNotMatch(r.content, /hunter|aaaa/);
+    }
+  });
+
+  it('leaves clean text untouched', () => {
+    cli(dir, ['store', 'c1', 'plain note about password rotation policy']);
+    const res = cliJson(dir, ['search', 'rotation']);
+    assert.equal(res.results[0].content, 'plain note about password rotation policy');
+  });
+});
+
+describe('memory-cli fitness-update', { skip: skipPython && 'Python not available' }, () => {
+  let dir;
+  before(() => {
+    dir = makeProject();
+    for (const k of ['a', 'b', 'c']) cli(dir, ['store', k, `fitness node ${k}`]);
+    cli(dir, ['migrate']);
+  });
+  after(() => fs.rmSync(dir, { recursive: true, force: true }));
+
+  it('matches the per-row Python formula', () => {
+    // access_count, importance, days since access (plus an hour, to stay off
+    // the day boundary) and inbound relations per node
+    const fixture = {
+      'fitness node a': [10, 0.9, 3, 7],
+      'fitness node b': [4, 0.5, 45, 1],
+      'fitness node c': [0, 0.2, 200, 0],
+    };
+    sql(dir, `
+from datetime import datetime, timedelta
+fixture = json.loads(sys.argv[2])
+for content, (access, imp, days, inbound) in fixture.items():
+    at = (datetime.now() - timedelta(days=days, hours=1)).isoformat()
+    nid = conn.execute("SELECT id FROM nodes WHERE content = ?", (content,)).fetchone()[0]
+    conn.execute("UPDATE nodes SET access_count = ?, importance = ?, accessed_at = ? WHERE id = ?",
+                 (access, imp, at, nid))
+    for _ in range(inbound):
+        conn.execute("INSERT INTO relations (agent_id, source_id, target_id, relation_type, created_at) "
+                     "VALUES ('t', 'x', ?, 'rel', '')", (nid,))
+conn.commit()
+`, JSON.stringify(fixture));
+
+    assert.deepEqual(cliJson(dir, ['fitness-update']), { updated: 3 });
+
+    const got = JSON.parse(sql(dir, 'print(json.dumps(dict(conn.execute("SELECT content, fitness FROM nodes"))))'));
+    const maxAccess = Math.max(...Object.values(fixture).map((f) => f[0])) || 1;
+    for (const [content, [access, imp, days, inbound]] of Object.entries(fixture)) {
+      const expected = 0.3 * (access / maxAccess) + 0.3 * imp
+        + 0.2 * Math.max(0, 1 - days / 90) + 0.2 * Math.min(1, inbound / 5);
+      assert.ok(Math.abs(got[content] - expected) < 1e-4, `${content}: ${got[content]} != ${expected}`);
+    }
+  });
+});
+
+describe('memory-cli daemon', {
+  skip: (skipPython && 'Python not available') || (process.platform === 'win32' && 'UNIX sockets only'),
+}, () => {
+  let dir;
+  let daemon;
+  let sockPath;
+  before(() => {
+    dir = makeProject();
+    sockPath = path.join(dir, '.claude-memory', 'db', 'cli.sock');
+    daemon = spawn(python.command, [CLI, 'daemon', '--idle-timeout', '30'], { cwd: dir, stdio: 'ignore' });
+    for (let i = 0; i < 100 && !fs.existsSync(sockPath); i++) sleep(50);
+  });
+  after(() => {
+    daemon.kill('SIGTERM');
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  it('serves the client over its socket', () => {
+    assert.ok(fs.existsSync(sockPath), 'daemon socket not created');
+    const run = (args) => execFileSync(python.command, [CLIENT, ...args], {
+      cwd: dir, encoding: 'utf-8', stdio: ['ignore', 'pipe', 'pipe'], timeout: 15000,
+    });
+
+    const stored = JSON.parse(run(['store', 'd1', 'served by the warm daemon']));
+    assert.equal(stored.success, true);
+    const res = JSON.parse(run(['search', 'daemon']));
+    assert.equal(res.count, 1);
+    assert.equal(res.results[0].id, stored.node_id);
+  });
+
+  it('answers one JSON line per connection', async () => {
+    const reply = await new Promise((resolve, reject) => {
+      const sock = net.createConnection(sockPath);
+      let buf = '';
+      sock.on('data', (chunk) => { buf += chunk; });
+      sock.on('end', () => resolve(JSON.parse(buf)));
+      sock.on('error', reject);
+      sock.end(JSON.stringify({ argv: ['stats'], stdin: '' }) + '\n');
+    });
+    assert.equal(reply.code, 0);
+    assert.equal(reply.stderr, '');
+    assert.equal(JSON.parse(reply.stdout).total_nodes, 1);
+  });
+});